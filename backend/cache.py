@@ -0,0 +1,240 @@
+# Arquivo: backend/cache.py
+"""Módulo de Cache (Redis) dos Dados do Dashboard.
+
+Este módulo guarda no Redis o JSON já codificado do dashboard, indexado por
+usuário e período, para que leituras repetidas não refaçam as agregações SQL.
+O cache é preenchido pela API (em caso de miss) e pela tarefa
+`task_recalculate_dashboard`.
+
+A invalidação é feita por contadores de geração, sem varrer o keyspace: a
+chave de cada dashboard embute a geração global (incrementada quando uma
+categoria muda, pois categorias são compartilhadas por todos os usuários) e
+a geração do usuário (incrementada a cada escrita de transação). Após um
+incremento, as chaves antigas deixam de ser lidas e expiram pelo TTL.
+
+O cache é opcional: sem `CELERY_BROKER_URL` configurada, ou com o Redis
+indisponível, todas as funções degradam para "sem cache" e a API continua
+consultando o banco normalmente.
+
+Attributes:
+    DASHBOARD_CACHE_TTL (int): Tempo de vida, em segundos, de cada entrada.
+    RECALCULO_EM_VOO_S (int): Tempo máximo, em segundos, em que um recálculo fica registrado como em andamento.
+    redis_client (Optional[redis.Redis]): Cliente Redis compartilhado, ou None se não configurado.
+
+Functions:
+    geracao_dashboard: Retorna a geração atual dos dashboards de um usuário.
+    chave_dashboard: Monta a chave de cache de um dashboard.
+    ler_dashboard_em_cache: Retorna o JSON em cache de um dashboard, se existir.
+    salvar_dashboard_em_cache: Grava o JSON de um dashboard no cache.
+    invalidar_dashboards_do_usuario: Invalida todos os dashboards em cache de um usuário.
+    invalidar_todos_os_dashboards: Invalida os dashboards em cache de todos os usuários.
+    registrar_recalculo_em_voo: Registra (ou obtém) a tarefa que está recalculando um dashboard.
+    liberar_recalculo_em_voo: Remove o registro de um recálculo que não vai produzir resultado.
+"""
+
+from datetime import date
+from typing import Optional
+
+import redis
+
+from .core.config import settings
+
+DASHBOARD_CACHE_TTL = 300
+RECALCULO_EM_VOO_S = 10
+
+# Reutiliza o Redis do broker; a conexão só é aberta no primeiro comando
+redis_client: Optional[redis.Redis] = (
+    redis.Redis.from_url(
+        settings.CELERY_BROKER_URL,
+        socket_connect_timeout=1,
+        socket_timeout=1,
+    )
+    if settings.CELERY_BROKER_URL
+    else None
+)
+
+
+_CHAVE_GERACAO_GLOBAL = "dash:ger"
+
+def _chave_geracao_usuario(usuario_id: int) -> str:
+    return f"dash:ger:{usuario_id}"
+
+def geracao_dashboard(usuario_id: int) -> Optional[str]:
+    """Retorna a geração atual dos dashboards de um usuário.
+
+    Args:
+        usuario_id (int): ID do usuário.
+
+    Returns:
+        Optional[str]: A geração no formato `{global}.{usuario}`, ou None se o
+        Redis não estiver configurado ou disponível.
+    """
+    if redis_client is None:
+        return None
+    try:
+        global_, do_usuario = redis_client.mget(
+            _CHAVE_GERACAO_GLOBAL, _chave_geracao_usuario(usuario_id)
+        )
+    except redis.RedisError:
+        return None
+    return f"{int(global_ or 0)}.{int(do_usuario or 0)}"
+
+def chave_dashboard(usuario_id: int, data_inicio: date, data_fim: date, geracao: str) -> str:
+    """Monta a chave de cache de um dashboard.
+
+    Args:
+        usuario_id (int): ID do usuário.
+        data_inicio (date): Data inicial do período.
+        data_fim (date): Data final do período.
+        geracao (str): Geração retornada por `geracao_dashboard`.
+
+    Returns:
+        str: A chave no formato `dashboard:{usuario_id}:{geracao}:{data_inicio}:{data_fim}`.
+    """
+    return f"dashboard:{usuario_id}:{geracao}:{data_inicio.isoformat()}:{data_fim.isoformat()}"
+
+def ler_dashboard_em_cache(usuario_id: int, data_inicio: date, data_fim: date) -> Optional[bytes]:
+    """Retorna o JSON em cache de um dashboard, se existir.
+
+    Args:
+        usuario_id (int): ID do usuário.
+        data_inicio (date): Data inicial do período.
+        data_fim (date): Data final do período.
+
+    Returns:
+        Optional[bytes]: O JSON do dashboard, ou None em caso de miss ou Redis indisponível.
+    """
+    geracao = geracao_dashboard(usuario_id)
+    if geracao is None:
+        return None
+    try:
+        return redis_client.get(chave_dashboard(usuario_id, data_inicio, data_fim, geracao))
+    except redis.RedisError:
+        return None
+
+def salvar_dashboard_em_cache(
+    usuario_id: int,
+    data_inicio: date,
+    data_fim: date,
+    dados_json: bytes,
+    geracao: Optional[str] = None,
+) -> None:
+    """Grava o JSON de um dashboard no cache.
+
+    Args:
+        usuario_id (int): ID do usuário.
+        data_inicio (date): Data inicial do período.
+        data_fim (date): Data final do período.
+        dados_json (bytes): O dashboard já codificado em JSON.
+        geracao (Optional[str]): Geração lida antes do cálculo. Se os dados
+            mudaram durante o cálculo, o resultado vai para uma chave que já
+            não é lida. Se None, usa a geração atual.
+    """
+    if geracao is None:
+        geracao = geracao_dashboard(usuario_id)
+    if geracao is None:
+        return
+    try:
+        redis_client.set(
+            chave_dashboard(usuario_id, data_inicio, data_fim, geracao),
+            dados_json,
+            ex=DASHBOARD_CACHE_TTL
+        )
+    except redis.RedisError:
+        pass
+
+def invalidar_dashboards_do_usuario(usuario_id: int) -> None:
+    """Invalida todos os dashboards em cache de um usuário (qualquer período).
+
+    Incrementa a geração do usuário: os dashboards e os recálculos em
+    andamento da geração anterior deixam de ser encontrados.
+
+    Args:
+        usuario_id (int): ID do usuário cujas transações mudaram.
+    """
+    if redis_client is None:
+        return
+    try:
+        redis_client.incr(_chave_geracao_usuario(usuario_id))
+    except redis.RedisError:
+        pass
+
+def invalidar_todos_os_dashboards() -> None:
+    """Invalida os dashboards em cache de todos os usuários.
+
+    Usado quando uma categoria muda: nome, cor e tipo das categorias
+    aparecem (e agrupam os totais) nos dashboards de qualquer usuário.
+    """
+    if redis_client is None:
+        return
+    try:
+        redis_client.incr(_CHAVE_GERACAO_GLOBAL)
+    except redis.RedisError:
+        pass
+
+
+# --- Recálculo Compartilhado (leituras com cache frio) ---
+
+def _chave_em_voo(usuario_id: int, data_inicio: date, data_fim: date, geracao: str) -> str:
+    return f"dash:voo:{usuario_id}:{geracao}:{data_inicio.isoformat()}:{data_fim.isoformat()}"
+
+# Remove a chave apenas se ela ainda aponta para a tarefa do chamador
+_LUA_LIBERAR_SE_IGUAL = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def registrar_recalculo_em_voo(
+    usuario_id: int, data_inicio: date, data_fim: date, task_id: str
+) -> Optional[str]:
+    """Registra `task_id` como o recálculo em andamento do período, se não houver outro.
+
+    Permite que várias leituras simultâneas (cache frio) aguardem uma única
+    tarefa no worker, em vez de cada uma disparar o próprio cálculo.
+
+    Args:
+        usuario_id (int): ID do usuário.
+        data_inicio (date): Data inicial do período.
+        data_fim (date): Data final do período.
+        task_id (str): ID da tarefa que o chamador enfileiraria.
+
+    Returns:
+        Optional[str]: O ID da tarefa em andamento (igual a `task_id` se o
+        chamador obteve o registro e deve enfileirá-la), ou None se o Redis
+        estiver indisponível.
+    """
+    geracao = geracao_dashboard(usuario_id)
+    if geracao is None:
+        return None
+    try:
+        chave = _chave_em_voo(usuario_id, data_inicio, data_fim, geracao)
+        if redis_client.set(chave, task_id, nx=True, ex=RECALCULO_EM_VOO_S):
+            return task_id
+        atual = redis_client.get(chave)
+        return atual.decode() if atual is not None else None
+    except redis.RedisError:
+        return None
+
+def liberar_recalculo_em_voo(usuario_id: int, data_inicio: date, data_fim: date, task_id: str) -> None:
+    """Remove o registro de um recálculo que não vai produzir resultado.
+
+    Chamada por quem registrou `task_id` quando a publicação falha ou a espera
+    estoura, para que as próximas leituras não aguardem uma tarefa perdida.
+
+    Args:
+        usuario_id (int): ID do usuário.
+        data_inicio (date): Data inicial do período.
+        data_fim (date): Data final do período.
+        task_id (str): ID da tarefa registrada pelo chamador.
+    """
+    geracao = geracao_dashboard(usuario_id)
+    if geracao is None:
+        return
+    try:
+        redis_client.eval(
+            _LUA_LIBERAR_SE_IGUAL, 1, _chave_em_voo(usuario_id, data_inicio, data_fim, geracao), task_id
+        )
+    except redis.RedisError:
+        pass
@@ -25,20 +25,34 @@ class Settings(BaseSettings):
         SECRET_KEY (str): Chave secreta usada para assinar tokens JWT e outras operações criptográficas.
         ALGORITHM (str): Algoritmo de criptografia usado para gerar tokens JWT. Padrão: "HS256".
         ACCESS_TOKEN_EXPIRE_MINUTES (int): Tempo de expiração dos tokens de acesso em minutos. Padrão: 30.
+        DEBUG (bool): Habilita recursos de depuração (ex: a tarefa `test_ping` do worker). Padrão: False.
         DATABASE_URL (Optional[str]): URL de conexão com o banco de dados. Se não fornecido, pode-se usar um fallback (e.g., SQLite).
+        DB_POOL_SIZE (int): Conexões mantidas abertas no pool do PostgreSQL, por processo. Padrão: 5.
+        DB_MAX_OVERFLOW (int): Conexões extras (temporárias) permitidas acima de `DB_POOL_SIZE`. Padrão: 10.
         CELERY_BROKER_URL (Optional[str]): URL do broker de mensagens para o Celery (ex: Redis). Opcional para deploys que não utilizam filas.
+        CELERY_BROKER_POOL_LIMIT (int): Máximo de conexões reutilizáveis com o broker por processo (API ou worker). Padrão: 20.
+        CELERY_RESULT_BACKEND (Optional[str]): URL do backend de resultados do Celery (ex: Redis). Se definido, a API aguarda o recálculo do dashboard feito pelo worker em vez de calculá-lo na própria requisição.
+        DASHBOARD_WORKER_TIMEOUT_S (float): Espera máxima, em segundos, pelo dashboard calculado no worker antes de calculá-lo localmente. Padrão: 2.0.
+        DASHBOARD_WORKER_PAUSA_S (float): Após uma falha ou timeout do worker, tempo em segundos em que a API deixa de consultá-lo e calcula localmente. Padrão: 30.0.
     """
     
     # --- Configurações de Segurança ---
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    DEBUG: bool = False
     
     # --- Configurações do Banco de Dados ---
     DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
     
     # --- Configurações da Fila ---
     CELERY_BROKER_URL: Optional[str] = None
+    CELERY_BROKER_POOL_LIMIT: int = 20
+    CELERY_RESULT_BACKEND: Optional[str] = None
+    DASHBOARD_WORKER_TIMEOUT_S: float = 2.0
+    DASHBOARD_WORKER_PAUSA_S: float = 30.0
 
     model_config = SettingsConfigDict(
         env_file=ENV_PATH,
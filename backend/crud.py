@@ -12,6 +12,7 @@ Functions:
     criar_usuario: Cria um novo usuário no sistema.
     atualizar_detalhes_usuario: Atualiza dados do perfil do usuário.
     mudar_senha_usuario: Altera a senha do usuário.
+    atualizar_hash_da_senha: Regera o hash da senha com os parâmetros atuais.
     criar_categoria: Cria uma nova categoria de transação.
     listar_categorias: Retorna todas as categorias cadastradas.
     atualizar_categoria: Atualiza uma categoria existente.
@@ -31,7 +32,7 @@ from sqlalchemy.exc import IntegrityError
 from datetime import date, timedelta
 import decimal
 
-from . import models, schemas, security
+from . import fast_schemas, models, schemas, security
 
 # --- FUNÇÕES CRUD (USUÁRIO) ---
 
@@ -124,6 +125,21 @@ def mudar_senha_usuario(
     
     return True
 
+def atualizar_hash_da_senha(db: Session, usuario: models.Usuario, senha_plana: str) -> None:
+    """Regera o hash da senha do usuário com os parâmetros Argon2 atuais.
+
+    Usado no login para migrar, de forma gradual, hashes criados com
+    parâmetros antigos.
+
+    Args:
+        db (Session): Sessão ativa do banco de dados.
+        usuario (models.Usuario): O usuário autenticado.
+        senha_plana (str): A senha em texto plano já verificada.
+    """
+    usuario.senha_hash = security.get_hash_da_senha(senha_plana)
+    db.add(usuario)
+    db.commit()
+
 # --- FUNÇÕES CRUD (CATEGORIA) ---
 
 def criar_categoria(db: Session, categoria: schemas.CategoriaCreate) -> models.Categoria:
@@ -287,7 +303,33 @@ def deletar_transacao(
     db.commit()
     return True
 
-def listar_transacoes(db: Session, usuario_id: int, skip: int = 0, limit: int = 100) -> list[models.Transacao]:
+def _construir_transacao(db_transacao: models.Transacao) -> fast_schemas.Transacao:
+    """Converte uma transação do banco no schema de resposta sem revalidá-la.
+
+    Os dados vêm do próprio banco e são confiáveis, então a Struct msgspec é
+    montada diretamente, sem passada de validação.
+
+    Args:
+        db_transacao (models.Transacao): Transação com a categoria já carregada.
+
+    Returns:
+        fast_schemas.Transacao: O schema de resposta preenchido.
+    """
+    categoria = db_transacao.categoria
+    return fast_schemas.Transacao(
+        id=db_transacao.id,
+        descricao=db_transacao.descricao,
+        valor=db_transacao.valor,
+        categoria_id=db_transacao.categoria_id,
+        data=db_transacao.data,
+        observacoes=db_transacao.observacoes,
+        usuario_id=db_transacao.usuario_id,
+        categoria=fast_schemas.Categoria(
+            id=categoria.id, nome=categoria.nome, tipo=categoria.tipo, cor=categoria.cor
+        )
+    )
+
+def listar_transacoes(db: Session, usuario_id: int, skip: int = 0, limit: int = 100) -> list[fast_schemas.Transacao]:
     """Retorna uma lista paginada das transações de um usuário.
 
     Args:
@@ -297,22 +339,23 @@ def listar_transacoes(db: Session, usuario_id: int, skip: int = 0, limit: int =
         limit (int): Número máximo de registros a retornar. Padrão: 100.
 
     Returns:
-        list[models.Transacao]: Lista de transações encontradas.
+        list[fast_schemas.Transacao]: Lista de transações encontradas.
     """
-    return db.query(models.Transacao).options(
+    transacoes = db.query(models.Transacao).options(
         joinedload(models.Transacao.categoria)
     ).filter(
         models.Transacao.usuario_id == usuario_id
     ).order_by(
         models.Transacao.data.desc()
     ).offset(skip).limit(limit).all()
+    return [_construir_transacao(t) for t in transacoes]
 
 def listar_transacoes_por_periodo(
     db: Session, 
     usuario_id: int, 
     data_inicio: date, 
     data_fim: date
-) -> list[models.Transacao]:
+) -> list[fast_schemas.Transacao]:
     """Retorna todas as transações de um usuário em um determinado intervalo de tempo.
 
     Args:
@@ -322,11 +365,11 @@ def listar_transacoes_por_periodo(
         data_fim (date): Data final do período (inclusiva).
 
     Returns:
-        list[models.Transacao]: Lista de transações no período.
+        list[fast_schemas.Transacao]: Lista de transações no período.
     """
     data_fim_query = data_fim + timedelta(days=1)
     
-    return db.query(models.Transacao).options(
+    transacoes = db.query(models.Transacao).options(
         joinedload(models.Transacao.categoria)
     ).filter(
         models.Transacao.usuario_id == usuario_id,
@@ -335,11 +378,29 @@ def listar_transacoes_por_periodo(
     ).order_by(
         models.Transacao.data.desc() 
     ).all()
+    return [_construir_transacao(t) for t in transacoes]
 
 
 # --- FUNÇÕES ANALÍTICAS (DASHBOARD) ---
 
-def get_dashboard_data(db: Session, usuario_id: int, data_inicio: date, data_fim: date) -> schemas.DashboardData:
+def _montar_categorias_soa(linhas: list) -> fast_schemas.CategoriasSoA:
+    """Transpõe as linhas agregadas por categoria em colunas paralelas.
+
+    Args:
+        linhas (list): Tuplas (nome, cor, valor_total, total_compras) da consulta.
+
+    Returns:
+        fast_schemas.CategoriasSoA: Os dados das categorias em formato colunar.
+    """
+    nomes, cores, valores, totais = zip(*linhas) if linhas else ((), (), (), ())
+    return fast_schemas.CategoriasSoA(
+        nomes=list(nomes),
+        valores=list(valores),
+        totais=list(totais),
+        cores=list(cores)
+    )
+
+def get_dashboard_data(db: Session, usuario_id: int, data_inicio: date, data_fim: date) -> fast_schemas.DashboardData:
     """Calcula e retorna os dados consolidados para o dashboard financeiro.
 
     Inclui totais de receitas, despesas, lucro líquido e quebras por categoria.
@@ -351,7 +412,7 @@ def get_dashboard_data(db: Session, usuario_id: int, data_inicio: date, data_fim
         data_fim (date): Data final do período de análise.
 
     Returns:
-        schemas.DashboardData: Objeto com os dados processados para o dashboard.
+        fast_schemas.DashboardData: Objeto com os dados processados para o dashboard.
     """
     data_fim_query = data_fim + timedelta(days=1)
 
@@ -399,27 +460,10 @@ def get_dashboard_data(db: Session, usuario_id: int, data_inicio: date, data_fim
         func.sum(models.Transacao.valor).desc()
     ).all()
 
-    gastos_por_categoria = [
-        schemas.CategoriaDetalhada(
-            nome_categoria=nome, 
-            cor=cor,
-            valor_total=total, 
-            total_compras=count
-        )
-        for nome, cor, total, count in gastos_por_categoria_query
-    ]
-    
-    receitas_por_categoria = [
-        schemas.CategoriaDetalhada(
-            nome_categoria=nome, 
-            cor=cor,
-            valor_total=total, 
-            total_compras=count
-        )
-        for nome, cor, total, count in receitas_por_categoria_query
-    ]
+    gastos_por_categoria = _montar_categorias_soa(gastos_por_categoria_query)
+    receitas_por_categoria = _montar_categorias_soa(receitas_por_categoria_query)
 
-    return schemas.DashboardData(
+    return fast_schemas.DashboardData(
         total_receitas=total_receitas,
         total_gastos=total_gastos,
         lucro_liquido=lucro_liquido,
@@ -492,7 +536,10 @@ def get_dados_de_tendencia(
         ordenador_de_data
     ).all()
 
-    receitas = [schemas.PontoDeTendencia(data=r.data, valor=r.valor) for r in query_receitas]
-    despesas = [schemas.PontoDeTendencia(data=d.data, valor=d.valor) for d in query_despesas]
+    # Agrupamento por hora gera rótulos texto; por dia, datas
+    ponto = schemas.PontoAgregado if filtro == 'daily' else schemas.PontoDiario
+
+    receitas = [ponto(data=r.data, valor=r.valor) for r in query_receitas]
+    despesas = [ponto(data=d.data, valor=d.valor) for d in query_despesas]
 
     return schemas.DadosDeTendencia(receitas=receitas, despesas=despesas)
@@ -42,9 +42,20 @@ else:
 # Configuração específica para SQLite para permitir acesso de múltiplas threads
 connect_args = {"check_same_thread": False} if is_sqlite else {}
 
+# Pool dimensionado uma vez por processo (API ou filho do worker Celery); o
+# worker de threads do dashboard ajusta o tamanho à sua concorrência (ver worker.py).
+# pre_ping descarta conexões mortas e recycle evita timeouts do lado do servidor.
+pool_args = {} if is_sqlite else {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+}
+
 engine = create_engine(
     DATABASE_URL, 
-    connect_args=connect_args
+    connect_args=connect_args,
+    **pool_args
 )
 
 # --- Criação da Fábrica de Sessões ---
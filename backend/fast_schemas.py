@@ -0,0 +1,99 @@
+# Arquivo: backend/fast_schemas.py
+"""Módulo de Schemas msgspec para os Caminhos Quentes da API.
+
+Este módulo espelha, como `msgspec.Struct`, os schemas de resposta mais
+acessados (listagem de transações e dashboard). As instâncias são montadas
+a partir de dados confiáveis do banco e codificadas para JSON em uma única
+passada em C, sem as chamadas ao pydantic-core por campo.
+
+Os schemas Pydantic equivalentes em `schemas.py` continuam sendo a fonte
+da documentação OpenAPI (via `response_model`); os nomes e a ordem dos
+campos aqui devem permanecer idênticos aos de lá.
+
+Classes:
+    Categoria: Espelho de `schemas.CategoriaTD`.
+    Transacao: Espelho de `schemas.Transacao`.
+    CategoriasSoA: Espelho de `schemas.CategoriasSoA`.
+    DashboardData: Espelho de `schemas.DashboardData`.
+
+Attributes:
+    ENC (msgspec.json.Encoder): Codificador JSON compartilhado.
+"""
+
+import decimal
+from datetime import datetime
+from typing import List, Optional
+
+import msgspec
+
+
+class Categoria(msgspec.Struct):
+    """Categoria embutida na resposta de transação.
+
+    Attributes:
+        id (int): ID da categoria.
+        nome (str): Nome da categoria.
+        tipo (str): Tipo da categoria.
+        cor (str): Cor da categoria.
+    """
+    id: int
+    nome: str
+    tipo: str
+    cor: str
+
+class Transacao(msgspec.Struct):
+    """Transação na resposta das listagens.
+
+    Attributes:
+        descricao (str): Descrição da transação.
+        valor (decimal.Decimal): Valor da transação.
+        categoria_id (int): ID da categoria associada.
+        data (datetime): Data e hora da transação.
+        observacoes (Optional[str]): Observações adicionais.
+        id (int): ID da transação.
+        usuario_id (int): ID do usuário proprietário.
+        categoria (Categoria): Detalhes da categoria associada.
+    """
+    descricao: str
+    valor: decimal.Decimal
+    categoria_id: int
+    data: datetime
+    observacoes: Optional[str]
+    id: int
+    usuario_id: int
+    categoria: Categoria
+
+class CategoriasSoA(msgspec.Struct):
+    """Dados agregados por categoria em formato colunar.
+
+    Attributes:
+        nomes (List[str]): Nomes das categorias.
+        valores (List[decimal.Decimal]): Soma dos valores de cada categoria.
+        totais (List[int]): Contagem de transações de cada categoria.
+        cores (List[str]): Cores das categorias.
+    """
+    nomes: List[str]
+    valores: List[decimal.Decimal]
+    totais: List[int]
+    cores: List[str]
+
+class DashboardData(msgspec.Struct):
+    """Resumo financeiro consolidado do dashboard.
+
+    Attributes:
+        total_receitas (decimal.Decimal): Soma total de receitas.
+        total_gastos (decimal.Decimal): Soma total de despesas.
+        lucro_liquido (decimal.Decimal): Resultado (receitas - despesas).
+        gastos_por_categoria (CategoriasSoA): Gastos agrupados por categoria.
+        receitas_por_categoria (CategoriasSoA): Receitas agrupadas por categoria.
+    """
+    total_receitas: decimal.Decimal
+    total_gastos: decimal.Decimal
+    lucro_liquido: decimal.Decimal
+    gastos_por_categoria: CategoriasSoA
+    receitas_por_categoria: CategoriasSoA
+
+
+# --- Codificador pré-construído ---
+
+ENC = msgspec.json.Encoder()
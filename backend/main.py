@@ -12,17 +12,17 @@ Responsabilidades:
 - Definição de endpoints para Usuários, Transações, Categorias e Relatórios.
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError 
-from typing import List
-from datetime import timedelta, date
+from typing import List, Optional
+from datetime import date
 
-from . import crud, models, schemas, security
+from . import cache, crud, fast_schemas, models, schemas, security
+from .core.config import settings
 from .database import SessionLocal, engine
-from .core.config import settings 
 
 # --- Configuração Inicial ---
 
@@ -91,6 +91,46 @@ def get_usuario_atual(token: str = Depends(oauth2_scheme), db: Session = Depends
     return usuario
 
 
+def _resposta_json(dados: object) -> Response:
+    """Codifica schemas `fast_schemas` em JSON em uma única passada do msgspec.
+
+    Evita o `jsonable_encoder` do FastAPI e a revalidação via `response_model`
+    (o `response_model` das rotas permanece apenas para a documentação OpenAPI).
+
+    Args:
+        dados (object): Struct (ou lista de Structs) de `fast_schemas` montada pelo crud.
+
+    Returns:
+        Response: Resposta JSON pronta para envio.
+    """
+    return Response(content=fast_schemas.ENC.encode(dados), media_type="application/json")
+
+def _resposta_dashboard(
+    usuario_id: int,
+    data_inicio: date,
+    data_fim: date,
+    dashboard_data: fast_schemas.DashboardData,
+    geracao: Optional[str]
+) -> Response:
+    """Codifica o dashboard, grava-o no cache do período e monta a resposta.
+
+    Args:
+        usuario_id (int): ID do usuário.
+        data_inicio (date): Início do período.
+        data_fim (date): Fim do período.
+        dashboard_data (fast_schemas.DashboardData): Dados recém-calculados.
+        geracao (Optional[str]): Geração do cache lida antes do cálculo. Se None
+            (Redis indisponível), o dashboard não é gravado no cache.
+
+    Returns:
+        Response: Resposta JSON pronta para envio.
+    """
+    conteudo = fast_schemas.ENC.encode(dashboard_data)
+    if geracao is not None:
+        cache.salvar_dashboard_em_cache(usuario_id, data_inicio, data_fim, conteudo, geracao)
+    return Response(content=conteudo, media_type="application/json")
+
+
 # --- ENDPOINTS (Autenticação) ---
 
 @app.post("/token", response_model=schemas.Token, summary="Login do Usuário")
@@ -113,19 +153,22 @@ def login_para_obter_token(
         dict: Um dicionário contendo o token de acesso e o tipo do token.
     """
     usuario = crud.get_usuario_por_nome(db, nome_usuario=form_data.username)
+    if usuario is None:
+        # Mesmo custo de Argon2 de um login real: não revela se o usuário existe
+        security.verificar_senha_contra_inexistente()
     if not usuario or not security.verificar_senha(form_data.password, usuario.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Nome de usuário ou senha incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Migração gradual de hashes gerados com parâmetros Argon2 antigos
+    if security.precisa_rehash(usuario.senha_hash):
+        crud.atualizar_hash_da_senha(db, usuario=usuario, senha_plana=form_data.password)
     
-    access_token_expires = timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    )
-    access_token = security.criar_token_de_acesso(
-        data={"sub": usuario.nome_usuario}, expires_delta=access_token_expires
-    )
+    # Sem expires_delta: usa a expiração padrão pré-calculada em security
+    access_token = security.criar_token_de_acesso(data={"sub": usuario.nome_usuario})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/usuarios/", response_model=schemas.Usuario, status_code=status.HTTP_201_CREATED, summary="Criar Novo Usuário (Signup)")
@@ -257,12 +300,27 @@ def ler_dados_dashboard(
     Returns:
         schemas.DashboardData: Dados consolidados de receitas, despesas e categorias.
     """
-    return crud.get_dashboard_data(
+    em_cache = cache.ler_dashboard_em_cache(usuario_atual.id, data_inicio, data_fim)
+    if em_cache is not None:
+        return Response(content=em_cache, media_type="application/json")
+
+    # Com backend de resultados, leituras simultâneas compartilham um único cálculo no worker
+    if settings.CELERY_RESULT_BACKEND:
+        from .tasks import aguardar_dashboard_do_worker
+
+        do_worker = aguardar_dashboard_do_worker(usuario_atual.id, data_inicio, data_fim)
+        if do_worker is not None:
+            return Response(content=do_worker, media_type="application/json")
+
+    # Lida antes do cálculo: se houver escrita no meio, o resultado não é servido
+    geracao = cache.geracao_dashboard(usuario_atual.id)
+    dashboard_data = crud.get_dashboard_data(
         db=db, 
         usuario_id=usuario_atual.id,
         data_inicio=data_inicio, 
         data_fim=data_fim
     )
+    return _resposta_dashboard(usuario_atual.id, data_inicio, data_fim, dashboard_data, geracao)
 
 @app.get("/relatorios/tendencia", response_model=schemas.DadosDeTendencia, summary="Ler Dados do Gráfico de Linha")
 def ler_dados_de_tendencia(
@@ -316,7 +374,7 @@ def ler_transacoes_por_periodo(
         data_inicio=data_inicio,
         data_fim=data_fim
     )
-    return transacoes
+    return _resposta_json(transacoes)
 
 # --- ENDPOINTS DE TRANSAÇÃO (SÍNCRONO) ---
 
@@ -349,13 +407,17 @@ def criar_nova_transacao(
         usuario_id=usuario_atual.id
     )
     
+    # Os dados mudaram: descarta os dashboards em cache de qualquer período
+    cache.invalidar_dashboards_do_usuario(usuario_atual.id)
+
+    geracao = cache.geracao_dashboard(usuario_atual.id)
     dashboard_data = crud.get_dashboard_data(
         db=db,
         usuario_id=usuario_atual.id,
         data_inicio=data_inicio,
         data_fim=data_fim
     )
-    return dashboard_data
+    return _resposta_dashboard(usuario_atual.id, data_inicio, data_fim, dashboard_data, geracao)
 
 
 @app.put("/transacoes/{transacao_id}", 
@@ -395,13 +457,17 @@ def editar_transacao(
     if db_transacao is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transação não encontrada")
     
+    # Os dados mudaram: descarta os dashboards em cache de qualquer período
+    cache.invalidar_dashboards_do_usuario(usuario_atual.id)
+
+    geracao = cache.geracao_dashboard(usuario_atual.id)
     dashboard_data = crud.get_dashboard_data(
         db=db,
         usuario_id=usuario_atual.id,
         data_inicio=data_inicio,
         data_fim=data_fim
     )
-    return dashboard_data
+    return _resposta_dashboard(usuario_atual.id, data_inicio, data_fim, dashboard_data, geracao)
 
 @app.delete("/transacoes/{transacao_id}", response_model=schemas.DashboardData, summary="Deletar Transação (Síncrono)")
 def deletar_transacao_e_recalcular(
@@ -434,13 +500,17 @@ def deletar_transacao_e_recalcular(
     if not sucesso:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transação não encontrada")
         
+    # Os dados mudaram: descarta os dashboards em cache de qualquer período
+    cache.invalidar_dashboards_do_usuario(usuario_atual.id)
+
+    geracao = cache.geracao_dashboard(usuario_atual.id)
     dashboard_data = crud.get_dashboard_data(
         db=db,
         usuario_id=usuario_atual.id,
         data_inicio=data_inicio,
         data_fim=data_fim
     )
-    return dashboard_data
+    return _resposta_dashboard(usuario_atual.id, data_inicio, data_fim, dashboard_data, geracao)
 
 @app.get("/transacoes/", response_model=List[schemas.Transacao], summary="Listar Últimas Transações (Paginado)")
 def ler_transacoes(
@@ -461,7 +531,7 @@ def ler_transacoes(
         List[schemas.Transacao]: Lista de transações.
     """
     transacoes = crud.listar_transacoes(db, usuario_id=usuario_atual.id, skip=skip, limit=limit)
-    return transacoes
+    return _resposta_json(transacoes)
 
 # --- ENDPOINTS DE CATEGORIA ---
 
@@ -545,6 +615,9 @@ def editar_categoria(
         )
     if db_categoria is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria não encontrada")
+
+    # Categorias são globais: nome, cor e tipo aparecem nos dashboards de todos
+    cache.invalidar_todos_os_dashboards()
     return db_categoria
 
 @app.delete("/categorias/{categoria_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Deletar Categoria")
@@ -576,4 +649,6 @@ def deletar_categoria_endpoint(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Não é possível excluir: Esta categoria já está sendo usada por transações."
         )
+
+    cache.invalidar_todos_os_dashboards()
     return {"message": "Categoria deletada com sucesso."}
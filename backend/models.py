@@ -65,12 +65,12 @@ class Categoria(Base):
     """Representa uma categoria de transação na tabela 'categorias'.
 
     Categorias são usadas para classificar transações (ex: Alimentação, Transporte)
-    e possuem um tipo (Despesa ou Receita) e uma cor para exibição.
+    e possuem um tipo (Gasto ou Receita) e uma cor para exibição.
 
     Attributes:
         id (int): Identificador único da categoria (Chave Primária).
         nome (str): Nome da categoria.
-        tipo (str): Tipo da categoria ('Despesa' ou 'Receita').
+        tipo (str): Tipo da categoria ('Gasto' ou 'Receita').
         cor (str): Código hexadecimal da cor associada à categoria (ex: '#FF0000').
         transacoes (List[Transacao]): Relacionamento com as transações desta categoria.
     """
@@ -8,7 +8,7 @@ Garante a integridade e consistência dos dados que transitam entre o frontend
 e o backend.
 
 Classes:
-    CategoriaDetalhada: Schema auxiliar para agregação de dados de categorias.
+    CategoriasSoA: Schema auxiliar (colunar) para agregação de dados de categorias.
     DashboardData: Schema de resposta com resumo financeiro para o dashboard.
     Token: Schema de resposta contendo o token de acesso JWT.
     TokenData: Schema com dados decodificados do token JWT.
@@ -19,35 +19,78 @@ Classes:
     CategoriaCreate: Schema de entrada para criação de categoria.
     Categoria: Schema de resposta para detalhes da categoria.
     CategoriaUpdate: Schema de entrada para atualização de categoria.
+    CategoriaTD: Representação enxuta (TypedDict) da categoria embutida na transação.
     TransacaoCreate: Schema de entrada para criação de transação.
     Transacao: Schema de resposta para detalhes da transação.
-    PontoDeTendencia: Schema para pontos de dados em gráficos.
+    PontoDiario: Schema para pontos diários em gráficos.
+    PontoAgregado: Schema para pontos agrupados por hora em gráficos.
     DadosDeTendencia: Schema de resposta para dados de gráficos de tendência.
+
+Attributes:
+    PontoDeTendencia: União discriminada (por `kind`) de PontoDiario e PontoAgregado.
 """
 
-from pydantic import BaseModel, EmailStr
+from pydantic import AfterValidator, BaseModel, BeforeValidator, ConfigDict, Field
 from datetime import datetime, date
 import decimal
-from typing import Optional, List
+import re
+from typing import Annotated, Any, Literal, Optional, List, Union
+from typing_extensions import TypedDict
+
+# Valor monetário de uma transação: mesma precisão da coluna Numeric(10, 2),
+# para que valores grandes demais virem 422 e não um overflow no banco
+ValorTransacao = Annotated[decimal.Decimal, Field(max_digits=10, decimal_places=2)]
+
+# Valor monetário agregado (somas de transações), com folga para os totais
+Dinheiro = Annotated[decimal.Decimal, Field(max_digits=14, decimal_places=2)]
+
+# Validação leve de email: o endereço é armazenado como texto, sem normalização
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+def _checar_email(valor: str) -> str:
+    """Valida o formato básico de um endereço de email.
+
+    Args:
+        valor (str): O email informado.
+
+    Raises:
+        ValueError: Se o valor não tiver o formato `usuario@dominio.tld`.
+
+    Returns:
+        str: O próprio email, inalterado.
+    """
+    if _EMAIL_RE.fullmatch(valor) is None:
+        raise ValueError("Endereço de email inválido")
+    return valor
+
+Email = Annotated[str, AfterValidator(_checar_email)]
+
+# Configuração comum dos schemas de resposta: imutáveis e sem campos extras
+CONFIG_RESPOSTA = ConfigDict(
+    from_attributes=True,
+    frozen=True,
+    extra='forbid',
+    revalidate_instances='never',
+)
 
 # --- SCHEMAS PARA O DASHBOARD ---
 
-class CategoriaDetalhada(BaseModel):
-    """Schema auxiliar para dados agregados por categoria.
+class CategoriasSoA(BaseModel):
+    """Schema auxiliar com os dados agregados por categoria em formato colunar.
 
-    Usado em respostas de dashboard e relatórios para apresentar totais
-    por categoria.
+    Cada atributo é uma lista paralela (mesmo índice = mesma categoria), o que
+    reduz N submodelos por resposta a uma única validação por coluna.
 
     Attributes:
-        nome_categoria (str): Nome da categoria.
-        valor_total (decimal.Decimal): Soma dos valores das transações da categoria.
-        total_compras (int): Contagem de transações na categoria.
-        cor (str): Cor associada à categoria para visualização.
+        nomes (List[str]): Nomes das categorias.
+        valores (List[Dinheiro]): Soma dos valores das transações de cada categoria.
+        totais (List[int]): Contagem de transações de cada categoria.
+        cores (List[str]): Cores associadas às categorias para visualização.
     """
-    nome_categoria: str
-    valor_total: decimal.Decimal
-    total_compras: int # (Para receitas, isso é 'total_registros')
-    cor: str
+    nomes: List[str]
+    valores: List[Dinheiro]
+    totais: List[int] # (Para receitas, isso é 'total_registros')
+    cores: List[str]
 
 class DashboardData(BaseModel):
     """Schema de resposta para o endpoint de dashboard.
@@ -55,17 +98,19 @@ class DashboardData(BaseModel):
     Contém o resumo financeiro consolidado.
 
     Attributes:
-        total_receitas (decimal.Decimal): Soma total de receitas.
-        total_gastos (decimal.Decimal): Soma total de despesas.
-        lucro_liquido (decimal.Decimal): Resultado (receitas - despesas).
-        gastos_por_categoria (List[CategoriaDetalhada]): Lista de gastos agrupados por categoria.
-        receitas_por_categoria (List[CategoriaDetalhada]): Lista de receitas agrupadas por categoria.
+        total_receitas (Dinheiro): Soma total de receitas.
+        total_gastos (Dinheiro): Soma total de despesas.
+        lucro_liquido (Dinheiro): Resultado (receitas - despesas).
+        gastos_por_categoria (CategoriasSoA): Gastos agrupados por categoria.
+        receitas_por_categoria (CategoriasSoA): Receitas agrupadas por categoria.
     """
-    total_receitas: decimal.Decimal
-    total_gastos: decimal.Decimal
-    lucro_liquido: decimal.Decimal
-    gastos_por_categoria: List[CategoriaDetalhada] 
-    receitas_por_categoria: List[CategoriaDetalhada]
+    total_receitas: Dinheiro
+    total_gastos: Dinheiro
+    lucro_liquido: Dinheiro
+    gastos_por_categoria: CategoriasSoA
+    receitas_por_categoria: CategoriasSoA
+
+    model_config = CONFIG_RESPOSTA
 
 
 # --- SCHEMAS PARA AUTENTICAÇÃO ---
@@ -111,7 +156,7 @@ class Usuario(BaseModel):
         nome_completo (Optional[str]): Nome completo do usuário.
         data_nascimento (Optional[date]): Data de nascimento.
         avatar_url (Optional[str]): URL do avatar.
-        email (Optional[EmailStr]): Endereço de email.
+        email (Optional[Email]): Endereço de email.
     """
     id: int
     nome_usuario: str
@@ -121,9 +166,9 @@ class Usuario(BaseModel):
     nome_completo: Optional[str] = None
     data_nascimento: Optional[date] = None
     avatar_url: Optional[str] = None
-    email: Optional[EmailStr] = None 
+    email: Optional[Email] = None 
 
-    model_config = {'from_attributes': True}
+    model_config = CONFIG_RESPOSTA
 
 
 class UsuarioUpdate(BaseModel):
@@ -134,13 +179,16 @@ class UsuarioUpdate(BaseModel):
         nome_completo (Optional[str]): Novo nome completo.
         data_nascimento (Optional[date]): Nova data de nascimento.
         avatar_url (Optional[str]): Nova URL de avatar.
-        email (Optional[EmailStr]): Novo email.
+        email (Optional[Email]): Novo email.
     """
     nome_usuario: Optional[str] = None 
     nome_completo: Optional[str] = None
     data_nascimento: Optional[date] = None
     avatar_url: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[Email] = None
+
+    # Endpoint pouco acessado: o CoreSchema é construído na primeira validação
+    model_config = ConfigDict(defer_build=True)
 
 class UsuarioChangePassword(BaseModel):
     """Schema de entrada para alteração de senha.
@@ -152,44 +200,87 @@ class UsuarioChangePassword(BaseModel):
     senha_antiga: str
     senha_nova: str
 
+    model_config = ConfigDict(defer_build=True)
+
 # --- SCHEMAS PARA CATEGORIA ---
 
+# Valores aceitos para o tipo da categoria (os mesmos filtrados em crud.py)
+TipoCategoria = Literal["Gasto", "Receita"]
+
 class CategoriaCreate(BaseModel):
     """Schema de entrada para criação de categoria.
 
     Attributes:
         nome (str): Nome da categoria.
-        tipo (str): Tipo da categoria ("Despesa" ou "Receita").
+        tipo (TipoCategoria): Tipo da categoria ("Gasto" ou "Receita").
         cor (str): Cor em formato hexadecimal. Padrão: "#CCCCCC".
     """
     nome: str
-    tipo: str
+    tipo: TipoCategoria
     cor: str = "#CCCCCC"
 
+    model_config = ConfigDict(defer_build=True)
+
 class Categoria(CategoriaCreate):
     """Schema de resposta para detalhes da categoria.
 
     Attributes:
         id (int): ID da categoria.
         nome (str): Nome da categoria.
-        tipo (str): Tipo da categoria.
+        tipo (str): Tipo da categoria. Aceita qualquer texto, pois linhas
+            antigas podem ter tipos anteriores à validação (ex: "Despesa").
         cor (str): Cor da categoria.
     """
     id: int
-    model_config = {'from_attributes': True}
+    tipo: str
+
+    # Schema de resposta: mantém a construção antecipada (não herda o defer_build)
+    model_config = ConfigDict(**CONFIG_RESPOSTA, defer_build=False)
 
 class CategoriaUpdate(BaseModel):
     """Schema de entrada para atualização de categoria.
 
     Attributes:
         nome (Optional[str]): Novo nome.
-        tipo (Optional[str]): Novo tipo.
+        tipo (Optional[TipoCategoria]): Novo tipo.
         cor (Optional[str]): Nova cor.
     """
     nome: Optional[str] = None
-    tipo: Optional[str] = None
+    tipo: Optional[TipoCategoria] = None
     cor: Optional[str] = None
 
+    model_config = ConfigDict(defer_build=True)
+
+class CategoriaTD(TypedDict):
+    """Categoria embutida na resposta de transação.
+
+    Usa TypedDict em vez de um BaseModel aninhado: a validação vira uma
+    checagem de dicionário, sem instanciar um submodelo por transação.
+
+    Attributes:
+        id (int): ID da categoria.
+        nome (str): Nome da categoria.
+        tipo (str): Tipo da categoria.
+        cor (str): Cor da categoria.
+    """
+    id: int
+    nome: str
+    tipo: str
+    cor: str
+
+def _categoria_para_dict(valor: Any) -> Any:
+    """Converte um objeto ORM de categoria no dicionário esperado por `CategoriaTD`.
+
+    Args:
+        valor (Any): Um `models.Categoria` ou um dicionário já pronto.
+
+    Returns:
+        Any: O dicionário com os campos da categoria.
+    """
+    if isinstance(valor, dict):
+        return valor
+    return {"id": valor.id, "nome": valor.nome, "tipo": valor.tipo, "cor": valor.cor}
+
 # --- SCHEMAS PARA TRANSAÇÃO ---
 
 class TransacaoCreate(BaseModel):
@@ -197,13 +288,13 @@ class TransacaoCreate(BaseModel):
 
     Attributes:
         descricao (str): Descrição da transação.
-        valor (decimal.Decimal): Valor da transação.
+        valor (ValorTransacao): Valor da transação.
         categoria_id (int): ID da categoria associada.
         data (datetime): Data e hora da transação.
         observacoes (Optional[str]): Observações adicionais.
     """
     descricao: str
-    valor: decimal.Decimal
+    valor: ValorTransacao
     categoria_id: int
     data: datetime
     observacoes: str | None = None
@@ -214,26 +305,43 @@ class Transacao(TransacaoCreate):
     Attributes:
         id (int): ID da transação.
         usuario_id (int): ID do usuário proprietário.
-        categoria (Categoria): Objeto com detalhes da categoria associada.
+        categoria (CategoriaTD): Detalhes da categoria associada.
     """
     id: int
     usuario_id: int
     
-    categoria: Categoria 
+    categoria: Annotated[CategoriaTD, BeforeValidator(_categoria_para_dict)]
     
-    model_config = {'from_attributes': True}
+    model_config = CONFIG_RESPOSTA
     
 # --- SCHEMAS PARA RELATÓRIOS ---
 
-class PontoDeTendencia(BaseModel):
-    """Representa um ponto de dados em um gráfico de tendência.
+class PontoDiario(BaseModel):
+    """Ponto de um gráfico de tendência agrupado por dia.
 
     Attributes:
-        data (date | str): Data ou hora do ponto.
-        valor (decimal.Decimal): Valor acumulado no ponto.
+        kind (Literal["day"]): Discriminador do tipo de ponto.
+        data (date): Dia do ponto.
+        valor (Dinheiro): Valor acumulado no ponto.
     """
-    data: date | str
-    valor: decimal.Decimal
+    kind: Literal["day"] = "day"
+    data: date
+    valor: Dinheiro
+
+class PontoAgregado(BaseModel):
+    """Ponto de um gráfico de tendência agrupado por hora.
+
+    Attributes:
+        kind (Literal["agg"]): Discriminador do tipo de ponto.
+        data (str): Hora do ponto no formato "YYYY-MM-DD HH:00:00".
+        valor (Dinheiro): Valor acumulado no ponto.
+    """
+    kind: Literal["agg"] = "agg"
+    data: str
+    valor: Dinheiro
+
+# União discriminada: o campo `kind` escolhe o schema sem tentativas de parsing
+PontoDeTendencia = Annotated[Union[PontoDiario, PontoAgregado], Field(discriminator="kind")]
 
 class DadosDeTendencia(BaseModel):
     """Schema de resposta para dados consolidados de gráficos de tendência.
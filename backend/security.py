@@ -4,21 +4,33 @@
 Este módulo implementa as funções críticas de segurança da aplicação, incluindo
 hashing de senhas e gerenciamento de tokens JWT (JSON Web Tokens).
 
-Utiliza a biblioteca Passlib com Argon2 para hashing de senhas e a biblioteca
-Python-Jose para codificação e decodificação de tokens JWT.
+Utiliza a biblioteca argon2-cffi (Argon2id) diretamente para hashing de senhas
+e a biblioteca PyJWT para codificação e decodificação de tokens JWT.
 
 Functions:
     verificar_senha: Confere se uma senha em texto plano corresponde a um hash.
     get_hash_da_senha: Gera o hash seguro de uma senha.
+    precisa_rehash: Indica se um hash foi gerado com parâmetros desatualizados.
+    verificar_senha_contra_inexistente: Executa um Argon2 equivalente quando o usuário não existe.
     criar_token_de_acesso: Gera um token JWT assinado.
     verificar_token_de_acesso: Valida e decodifica um token JWT.
 """
 
-from datetime import datetime, timedelta, timezone
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import HTTPException, status
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Mapping, Optional
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+import jwt
+import orjson
+from fastapi import HTTPException
 
 from . import schemas
 from .core.config import settings
@@ -28,13 +40,121 @@ SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-# --- Contexto de Senha ---
+# Expiração padrão em segundos, calculada uma única vez (o `exp` é um epoch inteiro)
+_DEFAULT_EXPIRES_S = ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# --- Codificação JWT ---
 
+class _OrjsonJWT(jwt.PyJWT):
+    """PyJWT com (de)serialização do payload via orjson.
+
+    Sobrescreve os ganchos `_encode_payload`/`_decode_payload`, previstos pelo
+    PyJWT para customizar a codificação do payload.
+    """
+
+    def _encode_payload(self, payload, headers=None, json_encoder=None):
+        return orjson.dumps(payload)
+
+    def _decode_payload(self, decoded):
+        try:
+            payload = orjson.loads(decoded["payload"])
+        except orjson.JSONDecodeError as e:
+            raise jwt.DecodeError(f"Invalid payload string: {e}") from e
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+        return payload
+
+class _HMACPreparado(jwt.algorithms.HMACAlgorithm):
+    """HMAC do PyJWT com o estado ipad/opad da chave pré-calculado.
+
+    A chave é fixa por processo, então `prepare_key` (que valida o formato da
+    chave) e os blocos `chave ^ ipad` / `chave ^ opad` são calculados uma única
+    vez por chave. Cada assinatura apenas copia os dois estados SHA já
+    alimentados, em vez de refazer o HMAC do zero.
+    """
+
+    def __init__(self, hash_alg):
+        super().__init__(hash_alg)
+        self._chaves: dict = {}
+        self._estados: dict = {}
+
+    def prepare_key(self, key):
+        preparada = self._chaves.get(key)
+        if preparada is None:
+            preparada = super().prepare_key(key)
+            self._chaves[key] = preparada
+        return preparada
+
+    def _estados_da_chave(self, key: bytes):
+        estados = self._estados.get(key)
+        if estados is None:
+            tamanho_bloco = self.hash_alg().block_size
+            bloco = self.hash_alg(key).digest() if len(key) > tamanho_bloco else key
+            bloco = bloco.ljust(tamanho_bloco, b"\0")
+            estados = (
+                self.hash_alg(bytes(b ^ 0x36 for b in bloco)),
+                self.hash_alg(bytes(b ^ 0x5C for b in bloco)),
+            )
+            self._estados[key] = estados
+        return estados
+
+    def sign(self, msg: bytes, key: bytes) -> bytes:
+        ipad, opad = self._estados_da_chave(key)
+        interno = ipad.copy()
+        interno.update(msg)
+        externo = opad.copy()
+        externo.update(interno.digest())
+        return externo.digest()
+
+    def verify(self, msg: bytes, key: bytes, sig: bytes) -> bool:
+        return hmac.compare_digest(sig, self.sign(msg, key))
+
+_jwt = _OrjsonJWT()
+if ALGORITHM == "HS256":
+    _jwt._jws.unregister_algorithm("HS256")
+    _jwt._jws.register_algorithm("HS256", _HMACPreparado(hashlib.sha256))
+
+# --- Cache de Verificação de Tokens ---
+
+# Tokens recentemente validados, indexados pelo SHA-256 do token (o token bruto
+# nunca é armazenado). Cada entrada vale por no máximo _JWT_CACHE_TTL segundos
+# e nunca além do `exp` do próprio token.
+_JWT_CACHE_MAX = 10_000
+_JWT_CACHE_TTL = 5.0
+_jwt_cache: "OrderedDict[bytes, tuple[float, float, schemas.TokenData]]" = OrderedDict()
+_jwt_cache_lock = threading.Lock()
+
+# --- Hasher de Senha ---
+
+# Instância única do Argon2id com o perfil recomendado pela OWASP
+# (Password Storage Cheat Sheet): m=19 MiB, t=2, p=1.
+# Hashes antigos (m=64 MiB, t=3, p=4) são migrados no login (ver precisa_rehash).
+_ph = PasswordHasher(
+    time_cost=2,
+    memory_cost=19456,
+    parallelism=1,
+    hash_len=32,
+    salt_len=16,
+)
+
+
+# Hash fixo usado quando o usuário não existe, para que o login gaste o mesmo
+# tempo de Argon2 nos dois casos (evita enumeração de usuários por tempo)
+_DUMMY_SENHA = "dummy-password-for-constant-time"
+_DUMMY_HASH = _ph.hash(_DUMMY_SENHA)
 
 # --- Funções de Senha ---
 
+# Argon2 é CPU/memória-intensivo e síncrono. Todas as rotas que o chamam são
+# `def` (não `async def`), então o FastAPI já as executa no threadpool e o
+# argon2-cffi libera o GIL durante o hash. Se alguma rota virar `async def`,
+# chame estas funções via `fastapi.concurrency.run_in_threadpool`.
+#
+# Cada hash aloca ~19 MiB; sem limite, um pico de cadastros/logins ocuparia
+# todas as threads do pool ao mesmo tempo (40 × 19 MiB) e disputaria os mesmos
+# núcleos. O semáforo limita os hashes simultâneos ao número de CPUs.
+_argon2_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+
 def verificar_senha(senha_plana: str, senha_hashed: str) -> bool:
     """Verifica se a senha fornecida corresponde ao hash armazenado.
 
@@ -45,7 +165,11 @@ def verificar_senha(senha_plana: str, senha_hashed: str) -> bool:
     Returns:
         bool: True se as senhas conferem, False caso contrário.
     """
-    return pwd_context.verify(senha_plana, senha_hashed)
+    try:
+        with _argon2_slots:
+            return _ph.verify(senha_hashed, senha_plana)
+    except (VerificationError, InvalidHashError):
+        return False
 
 def get_hash_da_senha(senha: str) -> str:
     """Gera um hash seguro para a senha fornecida usando Argon2.
@@ -56,38 +180,94 @@ def get_hash_da_senha(senha: str) -> str:
     Returns:
         str: O hash da senha gerado.
     """
-    return pwd_context.hash(senha)
+    with _argon2_slots:
+        return _ph.hash(senha)
+
+def verificar_senha_contra_inexistente() -> None:
+    """Executa uma verificação Argon2 descartável para um usuário inexistente.
+
+    Deve ser chamada no ramo "usuário não encontrado" do login, igualando o
+    custo ao de uma verificação real de senha.
+    """
+    with _argon2_slots:
+        _ph.verify(_DUMMY_HASH, _DUMMY_SENHA)
+
+def precisa_rehash(senha_hashed: str) -> bool:
+    """Verifica se o hash foi gerado com parâmetros diferentes dos atuais.
+
+    Args:
+        senha_hashed (str): O hash da senha armazenado no banco de dados.
+
+    Returns:
+        bool: True se o hash deve ser regenerado com os parâmetros atuais.
+    """
+    return _ph.check_needs_rehash(senha_hashed)
 
 
 # --- Funções de Token (JWT) ---
 
-def criar_token_de_acesso(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+def _exp_ja_passou(token: str) -> bool:
+    """Lê o `exp` do payload, sem verificar a assinatura, e diz se já passou.
+
+    Qualquer token malformado retorna False, deixando o erro para `_jwt.decode`.
+    """
+    partes = token.split(".")
+    if len(partes) != 3:
+        return False
+    try:
+        payload = orjson.loads(base64.urlsafe_b64decode(partes[1] + "=" * (-len(partes[1]) % 4)))
+    except (binascii.Error, ValueError):
+        return False
+    exp = payload.get("exp") if isinstance(payload, dict) else None
+    if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+        return False
+    return exp <= time.time()
+
+# Os parâmetros keyword-only com prefixo `_` abaixo não fazem parte da API:
+# apenas capturam constantes e funções do módulo como variáveis locais
+# (LOAD_FAST em vez de LOAD_GLOBAL) nas duas funções chamadas a cada requisição.
+
+def criar_token_de_acesso(
+    data: Mapping[str, Any],
+    expires_delta: Optional[timedelta] = None,
+    *,
+    _secret: str = SECRET_KEY,
+    _alg: str = ALGORITHM,
+    _default_s: int = _DEFAULT_EXPIRES_S,
+    _encode=_jwt.encode,
+    _time=time.time,
+) -> str:
     """Cria um token de acesso JWT com tempo de expiração.
 
     Args:
-        data (dict): Dicionário com os dados (claims) a serem incluídos no token.
+        data (Mapping[str, Any]): Dados (claims) a serem incluídos no token. Não é modificado.
         expires_delta (Optional[timedelta]): Tempo de expiração personalizado. Se None, usa o padrão.
 
     Returns:
         str: O token JWT codificado.
     """
-    to_encode = data.copy()
-    
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    
-    to_encode.update({"exp": expire})
-    
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    expira_em_s = int(expires_delta.total_seconds()) if expires_delta else _default_s
+    return _encode({**data, "exp": int(_time()) + expira_em_s}, _secret, algorithm=_alg)
 
-def verificar_token_de_acesso(token: str, credentials_exception: HTTPException) -> schemas.TokenData:
+def verificar_token_de_acesso(
+    token: str,
+    credentials_exception: HTTPException,
+    *,
+    _secret: str = SECRET_KEY,
+    _algoritmos: tuple = (ALGORITHM,),
+    _opcoes: dict = {"require": ["exp", "sub"]},
+    _decode=_jwt.decode,
+    _sha256=hashlib.sha256,
+    _cache=_jwt_cache,
+    _lock=_jwt_cache_lock,
+    _time=time.time,
+    _monotonic=time.monotonic,
+) -> schemas.TokenData:
     """Valida um token de acesso JWT e extrai as informações do usuário.
 
+    Tokens validados recentemente são servidos do cache em memória
+    (`_jwt_cache`) sem repetir a decodificação.
+
     Args:
         token (str): O token JWT a ser validado.
         credentials_exception (HTTPException): Exceção a ser lançada em caso de falha na validação.
@@ -98,14 +278,39 @@ def verificar_token_de_acesso(token: str, credentials_exception: HTTPException)
     Returns:
         schemas.TokenData: Objeto contendo os dados extraídos do token (ex: nome de usuário).
     """
+    chave = _sha256(token.encode()).digest()
+    with _lock:
+        entrada = _cache.get(chave)
+        if entrada is not None:
+            expira_cache, exp_token, token_data = entrada
+            if expira_cache > _monotonic() and _time() < exp_token:
+                _cache.move_to_end(chave)
+                return token_data
+            del _cache[chave]
+
+    # Pré-checagem barata do `exp` (sem confiar no payload): tokens já expirados
+    # são recusados sem calcular o HMAC. A validação completa continua abaixo.
+    if _exp_ja_passou(token):
+        raise credentials_exception
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode(token, _secret, algorithms=_algoritmos, options=_opcoes)
         
         nome_usuario: str = payload.get("sub")
         if nome_usuario is None:
             raise credentials_exception
         
-        return schemas.TokenData(nome_usuario=nome_usuario)
+        token_data = schemas.TokenData(nome_usuario=nome_usuario)
     
-    except JWTError:
+    except jwt.PyJWTError:
         raise credentials_exception
+
+    exp_token = payload.get("exp")
+    if exp_token is not None:
+        ttl = min(_JWT_CACHE_TTL, exp_token - _time())
+        with _lock:
+            _cache[chave] = (_monotonic() + ttl, exp_token, token_data)
+            if len(_cache) > _JWT_CACHE_MAX:
+                _cache.popitem(last=False)
+
+    return token_data
@@ -9,35 +9,62 @@ A principal tarefa atual é o recálculo de dados do dashboard após alteraçõe
 
 Functions:
     task_recalculate_dashboard: Tarefa para recalcular métricas do dashboard em background.
+    aguardar_dashboard_do_worker: Obtém o dashboard calculado pelo worker, compartilhando o cálculo entre leituras.
 """
 
-from datetime import date, timedelta
+import time
+import uuid
+from datetime import date
+from typing import Optional
 
-from backend.worker import celery_app
+from celery.utils.log import get_task_logger
+
+from backend.worker import celery_app, publicar_tarefa
 from backend.database import SessionLocal
-from backend import crud
+from backend import cache, crud, fast_schemas
+from backend.core.config import settings
+
+logger = get_task_logger(__name__)
+
+# Instante (time.monotonic) até o qual a API não consulta o worker, após uma
+# falha ou timeout. Evita que cada leitura com cache frio espere o timeout
+# inteiro enquanto o worker ou o broker estiverem fora do ar.
+_worker_pausado_ate = 0.0
 
 # --- TAREFA DE RECALCULAR O DASHBOARD ---
 
-@celery_app.task(name="task_recalculate_dashboard")
-def task_recalculate_dashboard(usuario_id: int):
+@celery_app.task(name="task_recalculate_dashboard", ignore_result=False)
+def task_recalculate_dashboard(usuario_id: int, data_inicio_iso: str, data_fim_iso: str) -> Optional[str]:
     """Tarefa assíncrona para recalcular os dados do dashboard de um usuário.
 
     Esta função é executada por um worker Celery. Ela cria sua própria sessão
-    de banco de dados, executa a lógica de cálculo do dashboard e (futuramente)
-    pode atualizar um cache ou notificar o usuário.
+    de banco de dados, executa a lógica de cálculo do dashboard para o período
+    informado e grava o resultado no cache Redis (ver `backend.cache`). É
+    idempotente por (usuário, período).
 
     Args:
         usuario_id (int): O ID do usuário para o qual os dados devem ser recalculados.
+        data_inicio_iso (str): Data inicial do período (ISO, "YYYY-MM-DD").
+        data_fim_iso (str): Data final do período (ISO, "YYYY-MM-DD").
+
+    Returns:
+        Optional[str]: O JSON do dashboard (guardado no backend de resultados
+        para quem aguarda a tarefa), ou None em caso de erro.
     """
-    print(f"[CELERY WORKER]: Recebida tarefa 'task_recalculate_dashboard' para usuario_id: {usuario_id}")
+    logger.info(
+        "Recalculando dashboard de usuario_id %s (%s a %s)", usuario_id, data_inicio_iso, data_fim_iso
+    )
     
     db = SessionLocal()
     
     try:
-        # Define o intervalo padrão de 30 dias para o cálculo
-        data_fim = date.today()
-        data_inicio = data_fim - timedelta(days=30)
+        # O período é o mesmo que o usuário está visualizando (e a chave do cache)
+        data_inicio = date.fromisoformat(data_inicio_iso)
+        data_fim = date.fromisoformat(data_fim_iso)
+
+        # Geração lida antes do cálculo: se houver escrita no meio, o resultado
+        # é gravado na geração antiga e não é servido
+        geracao = cache.geracao_dashboard(usuario_id)
 
         # Executa a lógica de negócios pesada
         dashboard_data = crud.get_dashboard_data(
@@ -47,12 +74,83 @@ def task_recalculate_dashboard(usuario_id: int):
             data_fim=data_fim
         )
         
-        # Futuro: Atualizar Cache Redis ou enviar WebSocket
+        # Deixa o resultado pronto para as próximas leituras do dashboard
+        conteudo = fast_schemas.ENC.encode(dashboard_data)
+        if geracao is not None:
+            cache.salvar_dashboard_em_cache(usuario_id, data_inicio, data_fim, conteudo, geracao)
         
-        print(f"[CELERY WORKER]: Tarefa concluída. Lucro líquido para usuario_id {usuario_id}: {dashboard_data.lucro_liquido}")
+        logger.info(
+            "Dashboard recalculado. Lucro líquido para usuario_id %s: %s", usuario_id, dashboard_data.lucro_liquido
+        )
+        return conteudo.decode()
 
     except Exception as e:
-        print(f"[CELERY WORKER]: ERRO na tarefa para usuario_id {usuario_id}. Erro: {e}")
+        logger.exception("Erro ao recalcular o dashboard de usuario_id %s: %s", usuario_id, e)
+        return None
     
     finally:
         db.close()
+
+def aguardar_dashboard_do_worker(
+    usuario_id: int,
+    data_inicio: date,
+    data_fim: date,
+    timeout: float = settings.DASHBOARD_WORKER_TIMEOUT_S,
+) -> Optional[bytes]:
+    """Obtém o dashboard calculado pelo worker, compartilhando o cálculo entre leituras.
+
+    A primeira leitura com o cache frio enfileira a tarefa com um ID próprio e
+    o registra no Redis; as leituras simultâneas do mesmo período encontram
+    esse ID e aguardam o mesmo resultado (`AsyncResult.get`), em vez de cada
+    uma refazer as agregações.
+
+    A tarefa expira após `timeout` segundos na fila: se nenhum worker a
+    consumir a tempo, ela é descartada em vez de se acumular. Se a publicação
+    ou a espera falharem, o registro é removido para não prender as leituras
+    seguintes, e o worker deixa de ser consultado por
+    `settings.DASHBOARD_WORKER_PAUSA_S` segundos.
+
+    Args:
+        usuario_id (int): ID do usuário.
+        data_inicio (date): Data inicial do período.
+        data_fim (date): Data final do período.
+        timeout (float): Tempo máximo, em segundos, de espera pelo worker.
+
+    Returns:
+        Optional[bytes]: O JSON do dashboard, ou None se não foi possível obtê-lo
+        do worker (o chamador deve calculá-lo localmente).
+    """
+    global _worker_pausado_ate
+    if time.monotonic() < _worker_pausado_ate:
+        return None
+
+    task_id = f"dash:{usuario_id}:{data_inicio.isoformat()}:{data_fim.isoformat()}:{uuid.uuid4().hex}"
+    em_voo = cache.registrar_recalculo_em_voo(usuario_id, data_inicio, data_fim, task_id)
+    if em_voo is None:
+        return None
+
+    dono = em_voo == task_id
+    try:
+        if dono:
+            resultado = publicar_tarefa(
+                "task_recalculate_dashboard",
+                (usuario_id, data_inicio.isoformat(), data_fim.isoformat()),
+                task_id=task_id,
+                expires=timeout,
+            )
+        else:
+            resultado = celery_app.AsyncResult(em_voo)
+        conteudo = resultado.get(timeout=timeout)
+    except Exception as e:
+        # Worker fora do ar, timeout ou broker indisponível: o chamador calcula localmente
+        logger.warning(
+            "Não foi possível obter o dashboard do worker para usuario_id %s: %s", usuario_id, e
+        )
+        _worker_pausado_ate = time.monotonic() + settings.DASHBOARD_WORKER_PAUSA_S
+        conteudo = None
+
+    if not conteudo:
+        if dono:
+            cache.liberar_recalculo_em_voo(usuario_id, data_inicio, data_fim, task_id)
+        return None
+    return conteudo.encode()
@@ -8,35 +8,210 @@ para o processo do worker.
 O worker é responsável por executar tarefas assíncronas em segundo plano,
 desacoplando o processamento pesado da API principal.
 
+O recálculo do dashboard passa a maior parte do tempo esperando o banco, por
+isso é roteado para a fila `dashboard`, consumida por um worker de threads
+(um único processo, em vez de um processo por tarefa). As threads dividem um
+único pool de conexões, que deve ter uma conexão por thread (`DB_POOL_SIZE`
+igual a `-c`); caso contrário, as threads excedentes esperam por conexão::
+
+    DB_POOL_SIZE=20 DB_MAX_OVERFLOW=0 \
+        celery -A backend.worker.celery_app worker -P threads -c 20 -Q dashboard --loglevel=info
+
+As demais tarefas vão para a fila padrão (`default`), em um worker prefork::
+
+    celery -A backend.worker.celery_app worker -Q default --loglevel=info
+
+Cada processo do worker reserva apenas a tarefa que está executando
+(`worker_prefetch_multiplier=1`) e só a confirma ao terminar (`task_acks_late`).
+Isso evita que uma tarefa espere atrás de outra já reservada pelo mesmo
+processo, ao custo de uma ida ao broker a mais por tarefa.
+
+Classes:
+    BlockingRedisTransport: Transporte Redis do kombu com pool de conexões bloqueante.
+
+Functions:
+    publicar_tarefa: Publica uma tarefa reutilizando um produtor do pool do app.
+
 Attributes:
     celery_app (Celery): A instância da aplicação Celery configurada.
 """
 
+from typing import Any, Mapping, Optional, Sequence
+
+import redis
 from celery import Celery
+from celery.signals import worker_process_init
+from celery.utils.log import get_task_logger
+from kombu.transport.redis import Channel as RedisChannel, Transport as RedisTransport
 from backend.core.config import settings
 
-# Criação da instância Celery com a URL do broker (Redis)
+logger = get_task_logger(__name__)
+
+# Pool de conexões bloqueante para o broker Redis. O pool padrão do kombu
+# levanta `ConnectionError("Too many connections")` assim que `max_connections`
+# é atingido; com o BlockingConnectionPool, uma rajada de publicações na API
+# espera (até 20 s) por uma conexão livre em vez de falhar.
+class _CanalRedisBloqueante(RedisChannel):
+    def _get_pool(self, asynchronous=False):
+        # O cliente assíncrono (consumo no worker) continua com o pool padrão
+        if asynchronous:
+            return super()._get_pool(asynchronous=True)
+        params = self._connparams(asynchronous=False)
+        self.keyprefix_fanout = self.keyprefix_fanout.format(db=params['db'])
+        return redis.BlockingConnectionPool(timeout=20, **params)
+
+class BlockingRedisTransport(RedisTransport):
+    """Transporte Redis do kombu que publica por um `redis.BlockingConnectionPool`."""
+    Channel = _CanalRedisBloqueante
+
+# Criação da instância Celery com a URL do broker (Redis) e, se configurado,
+# o backend de resultados (usado apenas pelo recálculo do dashboard)
 celery_app = Celery(
     "backend",
-    broker=settings.CELERY_BROKER_URL
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=['backend.tasks'],
 )
 
 # Configurações adicionais
 celery_app.conf.update(
     timezone='America/Sao_Paulo', 
-)
+    # msgpack (binário, decodificado em C) para argumentos e resultados
+    task_serializer='msgpack',
+    result_serializer='msgpack',
+    accept_content=['msgpack', 'json'],
+
+    # Resultados só são guardados pelas tarefas que optam por isso (ignore_result=False),
+    # e por pouco tempo: servem apenas a quem está aguardando o cálculo
+    task_ignore_result=True,
+    task_store_errors_even_if_ignored=False,
+    result_extended=False,
+    result_expires=60,
+
+    # O resultado guardado é o JSON do dashboard (centenas de bytes a alguns KB),
+    # que o zstd reduz ~2,5x; os argumentos das tarefas (~60 bytes) não compensam
+    result_compression='zstd',
+
+    # Pool do backend de resultados (Redis), separado do pool do broker:
+    # limitado e com keepalive/health check, como o do broker
+    redis_max_connections=20,
+    redis_socket_keepalive=True,
+    redis_backend_health_check_interval=60,
 
-# Descobre automaticamente tarefas definidas no pacote 'backend' (ex: backend/tasks.py)
-celery_app.autodiscover_tasks(
-    packages=['backend']
+    # Sem eventos de monitoramento (Flower etc.): nenhum PUBLISH extra por tarefa
+    worker_send_task_events=False,
+    task_send_sent_event=False,
+
+    # Conexões com o broker reaproveitadas entre publicações (.delay/.apply_async),
+    # dimensionadas para a concorrência do worker mais os produtores da API
+    broker_pool_limit=settings.CELERY_BROKER_POOL_LIMIT,
+    broker_connection_retry_on_startup=True,
+
+    # Retentativas limitadas: uma instabilidade do Redis não deve prender a
+    # thread da requisição em reconexões sem fim
+    broker_connection_retry=True,
+    broker_connection_max_retries=5,
+    broker_channel_error_retry=True,
+    task_publish_retry=True,
+    task_publish_retry_policy={
+        'max_retries': 3,
+        'interval_start': 0,
+        'interval_step': 0.2,
+        'interval_max': 1.0,
+    },
+
+    # Ajustes do transporte Redis: teto de conexões por processo, keepalive e
+    # health check para não herdar sockets mortos (que forçariam reconexões no
+    # meio de uma tarefa) e timeouts para não travar a publicação na API
+    broker_transport_options={
+        'max_connections': 50,
+        'socket_keepalive': True,
+        'health_check_interval': 60,
+        'retry_on_timeout': True,
+        'socket_connect_timeout': 10.0,
+        'visibility_timeout': 3600,
+    },
+    broker_transport=(
+        'backend.worker:BlockingRedisTransport'
+        if (settings.CELERY_BROKER_URL or '').startswith(('redis://', 'rediss://'))
+        else None
+    ),
+
+    # Tarefas pesadas em banco: cada processo reserva só a tarefa que executa,
+    # e a confirmação (ack) acontece ao final, devolvendo-a à fila se o processo morrer
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+
+    # Recicla o processo filho para conter o crescimento de memória: por uso de
+    # memória residente (~300 MB) e, como teto, a cada 500 tarefas
+    worker_max_tasks_per_child=500,
+    worker_max_memory_per_child=300_000,  # em KiB
+
+    # Tarefas limitadas por I/O do banco ficam em uma fila própria (ver docstring);
+    # o resto vai para a fila nomeada 'default', e cada worker consome só as suas (-Q)
+    task_default_queue='default',
+    task_routes={
+        'task_recalculate_dashboard': {'queue': 'dashboard'},
+    },
 )
 
-@celery_app.task(name="test_ping")
-def test_ping():
-    """Tarefa de teste simples para verificar a saúde do worker.
+def publicar_tarefa(
+    nome: str,
+    args: Sequence[Any] = (),
+    kwargs: Optional[Mapping[str, Any]] = None,
+    **opcoes: Any,
+):
+    """Publica uma tarefa reutilizando um produtor do pool do app.
+
+    Usa um produtor (e sua conexão) já aberto de `celery_app.producer_pool`,
+    esperando no máximo 5 s por um livre, em vez de negociar uma conexão nova
+    com o broker. A fila é resolvida por `task_routes`.
+
+    Args:
+        nome (str): Nome registrado da tarefa (ex: "task_recalculate_dashboard").
+        args (Sequence[Any]): Argumentos posicionais da tarefa.
+        kwargs (Optional[Mapping[str, Any]]): Argumentos nomeados da tarefa.
+        **opcoes: Opções repassadas a `send_task` (ex: task_id, countdown).
 
     Returns:
-        str: Retorna "Pong!" para confirmar a execução.
+        celery.result.AsyncResult: O resultado assíncrono da tarefa publicada.
     """
-    print(">>> PING-PONG (Celery Test Task) <<<")
-    return "Pong!"
+    with celery_app.producer_pool.acquire(block=True, timeout=5) as producer:
+        return celery_app.send_task(
+            nome, args=list(args), kwargs=dict(kwargs or {}), producer=producer, **opcoes
+        )
+
+@worker_process_init.connect
+def preparar_pool_do_processo(**kwargs):
+    """Prepara o pool de conexões do banco em cada processo filho do worker.
+
+    Após o fork, o filho não deve reutilizar as conexões herdadas do processo
+    pai: o pool é descartado (sem fechá-las) e uma conexão é aberta de imediato,
+    para que a primeira tarefa já encontre o pool aquecido.
+    """
+    from backend.database import engine
+
+    engine.dispose(close=False)
+    try:
+        with engine.connect():
+            pass
+    except Exception as e:
+        logger.warning("Não foi possível pré-aquecer o pool de conexões: %s", e)
+
+# Tarefa de diagnóstico, registrada apenas com DEBUG=true
+if settings.DEBUG:
+    @celery_app.task(name="test_ping")
+    def test_ping():
+        """Tarefa de teste simples para verificar a saúde do worker.
+
+        Returns:
+            str: Retorna "Pong!" para confirmar a execução.
+        """
+        logger.debug("PING-PONG (Celery Test Task)")
+        return "Pong!"
+
+# Importa as tarefas já ao carregar o app (e não só quando o loader processa
+# `include`): o processo pai do prefork as registra antes do fork e os filhos
+# herdam os módulos já importados (copy-on-write), sem reimportá-los.
+from backend import tasks as _tasks  # noqa: E402,F401
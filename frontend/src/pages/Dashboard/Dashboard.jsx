@@ -7,7 +7,7 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../../context/AuthContext';
 import { useOutletContext } from 'react-router-dom';
-import api from '../../services/api';
+import api, { zipCategorias } from '../../services/api';
 import './Dashboard.css';
 
 import DoughnutChart from '../../components/DoughnutChart/DoughnutChart';
@@ -119,7 +119,7 @@ function Dashboard() {
    */
   const getGastosChartData = () => {
       return data && data.gastos_por_categoria
-      ? data.gastos_por_categoria
+      ? zipCategorias(data.gastos_por_categoria)
           .filter(item => parseFloat(item.valor_total) > 0) 
           .map(item => ({
             nome: item.nome_categoria,
@@ -134,8 +134,9 @@ function Dashboard() {
    * Prepara os dados para o gráfico de receitas.
    */
   const getReceitasChartData = () => {
-      if (data && data.receitas_por_categoria && data.receitas_por_categoria.length > 0) {
-        return data.receitas_por_categoria
+      const receitasPorCategoria = data ? zipCategorias(data.receitas_por_categoria) : [];
+      if (receitasPorCategoria.length > 0) {
+        return receitasPorCategoria
           .filter(item => parseFloat(item.valor_total) > 0)
           .map(item => ({
             nome: item.nome_categoria,
@@ -7,7 +7,7 @@
 import React, { useState, useEffect } from 'react';
 import { useOutletContext } from 'react-router-dom';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
-import api from '../../services/api';
+import api, { zipCategorias } from '../../services/api';
 import './Reports.css';
 
 import FilterControls from '../../components/FilterControls/FilterControls';
@@ -148,7 +148,7 @@ function Reports() {
         setLineChartData(finalData);
 
         // Processa dados de Gastos por Categoria
-        const gastosFormatados = responseDashboard.data.gastos_por_categoria
+        const gastosFormatados = zipCategorias(responseDashboard.data.gastos_por_categoria)
           .filter(item => parseFloat(item.valor_total) > 0)
           .map(item => ({
             nome: item.nome_categoria,
@@ -160,7 +160,7 @@ function Reports() {
         setGastosBarData(gastosFormatados);
 
         // Processa dados de Receitas por Categoria
-        const receitasFormatadas = responseDashboard.data.receitas_por_categoria
+        const receitasFormatadas = zipCategorias(responseDashboard.data.receitas_por_categoria)
           .filter(item => parseFloat(item.valor_total) > 0)
           .map(item => ({
             nome: item.nome_categoria,
@@ -59,5 +59,26 @@ api.interceptors.response.use(
   }
 );
 
+/**
+ * Reconstrói a lista de categorias a partir do formato colunar retornado pelo dashboard.
+ *
+ * A API envia `gastos_por_categoria` e `receitas_por_categoria` como listas paralelas
+ * (`nomes`, `valores`, `totais`, `cores`); esta função as reagrupa em objetos por categoria.
+ *
+ * @param {{nomes: string[], valores: string[], totais: number[], cores: string[]}|Array} [soa] - Dados colunares (ou a lista já agrupada, de respostas antigas em cache).
+ * @returns {Array<{nome_categoria: string, valor_total: string, total_compras: number, cor: string}>} Lista de categorias.
+ */
+export const zipCategorias = (soa) => {
+  if (!soa) return [];
+  // Respostas antigas (em cache no service worker) ainda vêm como lista de objetos
+  if (Array.isArray(soa)) return soa;
+  return soa.nomes.map((nome, i) => ({
+    nome_categoria: nome,
+    valor_total: soa.valores[i],
+    total_compras: soa.totais[i],
+    cor: soa.cores[i],
+  }));
+};
+
 
 export default api;